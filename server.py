@@ -1,19 +1,27 @@
 import os
 import time
+import functools
 import hmac
-import hashlib
 import math
 import traceback
+from threading import Lock
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlsplit
 
+import numpy as np
+import orjson
 import requests
-from flask import Flask, jsonify, request, send_from_directory
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import Flask, request, send_from_directory
 
 app = Flask(__name__, static_folder="static")
 
 BINANCE_API_KEY = os.environ.get("BINANCE_API_KEY", "")
 BINANCE_API_SECRET = os.environ.get("BINANCE_API_SECRET", "")
+_SECRET = BINANCE_API_SECRET.encode()
+_HEADERS = {"X-MBX-APIKEY": BINANCE_API_KEY}
 
 # 币安 API 基础 URL（可通过环境变量覆盖，用于代理或切换域名）
 BINANCE_API_BASE = os.environ.get("BINANCE_API_BASE", "https://api.binance.com")
@@ -22,49 +30,148 @@ DERIBIT_API_BASE = os.environ.get("DERIBIT_API_BASE", "https://www.deribit.com/a
 
 SUPPORTED_COINS = ["ETH", "BTC"]
 
-
-# ── helpers ──────────────────────────────────────────────────────────────────
-
-def _sign(params: dict) -> dict:
-    """Add timestamp and HMAC-SHA256 signature to params."""
-    params["timestamp"] = int(time.time() * 1000)
-    query = urlencode(params)
-    sig = hmac.new(
-        BINANCE_API_SECRET.encode(), query.encode(), hashlib.sha256
-    ).hexdigest()
-    params["signature"] = sig
-    return params
+DUAL_PAGE_SIZE = 100
+
+# 上游请求均为 IO 密集，用线程池并发发出（分页、现货/产品/期权行情）
+_EXECUTOR = ThreadPoolExecutor(max_workers=16)
+# 逐合约深度查询单独一个池，批量扇出时不挤占上面的请求；并发上限 10，避免打满币安 IP 权重
+_DEPTH_POOL = ThreadPoolExecutor(max_workers=10)
+
+# 复用 keep-alive 连接，避免每次请求重新做 TCP + TLS 握手
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    # 只重试连接错误与 5xx；读超时不重试，否则一次卡住的请求会被放大成数倍 timeout
+    max_retries=Retry(
+        total=3,
+        connect=2,
+        read=0,
+        backoff_factor=0.3,
+        backoff_jitter=0.1,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["GET"],
+        # 不按 Retry-After 在请求线程里长时间 sleep
+        respect_retry_after_header=False,
+    ),
+))
+
+# 熔断：同一上游连续失败 3 次（5xx/超时/连接错误）后 5 秒内直接失败，避免请求堆积在超时上
+_BREAKER_THRESHOLD = 3
+_BREAKER_COOLDOWN = 5.0
+_breaker = {}  # host -> (consecutive failures, opened_at)
+_breaker_lock = Lock()
 
 
-def _headers() -> dict:
-    return {"X-MBX-APIKEY": BINANCE_API_KEY}
+# ── helpers ──────────────────────────────────────────────────────────────────
 
+def _sign_query(query: str) -> str:
+    """Append timestamp and HMAC-SHA256 signature to an urlencoded query."""
+    query = f"{query}&timestamp={int(time.time() * 1000)}"
+    sig = hmac.digest(_SECRET, query.encode(), "sha256").hex()
+    return f"{query}&signature={sig}"
+
+
+def _ttl_cache(ttl: float, maxsize: int = 64):
+    """Memoize a single-argument fetch for ``ttl`` seconds (thread-safe).
+
+    Concurrent misses on the same key share one in-flight call; other keys
+    are not blocked. Errors are propagated to all waiters but not cached.
+    Holds at most ``maxsize`` entries; expired entries are evicted on write.
+    """
+    def decorator(fn):
+        cache = {}
+        pending = {}  # key -> Future of the in-flight call
+        lock = Lock()
+
+        @functools.wraps(fn)
+        def wrapper(key):
+            with lock:
+                hit = cache.get(key)
+                if hit and time.monotonic() - hit[0] < ttl:
+                    return hit[1]
+                fut = pending.get(key)
+                owner = fut is None
+                if owner:
+                    fut = pending[key] = Future()
+            if not owner:
+                return fut.result()
+
+            try:
+                value = fn(key)
+            except BaseException as e:
+                with lock:
+                    del pending[key]
+                fut.set_exception(e)
+                raise
+            now = time.monotonic()
+            with lock:
+                del pending[key]
+                # 按写入时间排序：重新插入到末尾，从头部淘汰过期或超量的条目
+                cache.pop(key, None)
+                cache[key] = (now, value)
+                while len(cache) > maxsize or now - next(iter(cache.values()))[0] >= ttl:
+                    del cache[next(iter(cache))]
+            fut.set_result(value)
+            return value
+
+        return wrapper
+    return decorator
+
+
+def _get(url: str, **kwargs) -> requests.Response:
+    """GET through the pooled session, guarded by a per-host circuit breaker."""
+    host = urlsplit(url).netloc
+    with _breaker_lock:
+        failures, opened_at = _breaker.get(host, (0, 0.0))
+    if failures >= _BREAKER_THRESHOLD and time.monotonic() - opened_at < _BREAKER_COOLDOWN:
+        raise requests.ConnectionError(f"circuit open for {host}")
 
-def _format_strike(price) -> str:
-    """Format strike price as integer string (3500 not 3500.0)."""
+    try:
+        r = _SESSION.get(url, **kwargs)
+    except (requests.ConnectionError, requests.Timeout, requests.exceptions.RetryError):
+        # 429 不在重试状态码内，RetryError 只会来自重试耗尽的 5xx；限流不计入熔断
+        _record_failure(host)
+        raise
+    if r.status_code >= 500:
+        _record_failure(host)
+    else:
+        with _breaker_lock:
+            _breaker.pop(host, None)
+    return r
+
+
+def _record_failure(host: str) -> None:
+    with _breaker_lock:
+        failures, _ = _breaker.get(host, (0, 0.0))
+        _breaker[host] = (failures + 1, time.monotonic())
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_strike(price: str) -> str:
+    """Format strike price as integer string (3500 not 3500.0); cached per raw value."""
     f = float(price)
     if f == int(f):
         return str(int(f))
     return str(f)
 
 
-def _expiry_yymmdd(ts_ms) -> str:
-    """Convert millisecond timestamp to YYMMDD string."""
-    dt = datetime.fromtimestamp(int(ts_ms) / 1000, tz=timezone.utc)
-    return dt.strftime("%y%m%d")
+@functools.lru_cache(maxsize=256)
+def _expiry_fields(ts_ms: int) -> tuple[str, str]:
+    """Convert millisecond timestamp to (YYMMDD, YYYY-MM-DD); cached per expiry."""
+    dt = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
+    return dt.strftime("%y%m%d"), dt.strftime("%Y-%m-%d")
 
 
-def _expiry_date(ts_ms) -> str:
-    """Convert millisecond timestamp to YYYY-MM-DD string."""
-    dt = datetime.fromtimestamp(int(ts_ms) / 1000, tz=timezone.utc)
-    return dt.strftime("%Y-%m-%d")
+def _now_ms() -> int:
+    return int(time.time() * 1000)
 
 
-def _days_until(ts_ms) -> float:
-    """Days from now until the given millisecond timestamp."""
-    now = datetime.now(timezone.utc)
-    target = datetime.fromtimestamp(int(ts_ms) / 1000, tz=timezone.utc)
-    delta = (target - now).total_seconds() / 86400
+def _days_until(ts_ms: int, now_ms: int | None = None) -> float:
+    """Days from now (or ``now_ms``) until the given millisecond timestamp."""
+    if now_ms is None:
+        now_ms = _now_ms()
+    delta = (ts_ms - now_ms) / 86_400_000
     return round(max(delta, 0.01), 2)
 
 
@@ -76,75 +183,167 @@ def _days_label(days: float) -> str:
 
 # ── Binance API calls ───────────────────────────────────────────────────────
 
-def fetch_spot_price(coin: str) -> float:
+def _fetch_spot_price(coin: str) -> float:
     url = f"{BINANCE_API_BASE}/api/v3/ticker/price?symbol={coin}USDT"
-    r = requests.get(url, timeout=10)
+    r = _get(url, timeout=10)
     r.raise_for_status()
-    return float(r.json()["price"])
+    return float(orjson.loads(r.content)["price"])
 
 
-def fetch_dual_products(coin: str) -> list:
-    """Fetch dual investment products for both CALL and PUT."""
+def _fetch_dual_page(opt_type: str, invest: str, exercised: str,
+                     base_query: str, page: int) -> tuple:
+    """Fetch one page of dual products, return (items, total)."""
     base_url = f"{BINANCE_API_BASE}/sapi/v1/dci/product/list"
-    products = []
-
+    query = _sign_query(f"{base_query}&pageIndex={page}")
+    r = _get(f"{base_url}?{query}", headers=_HEADERS, timeout=15)
+    r.raise_for_status()
+    data = orjson.loads(r.content)
+    items = data.get("list") or data.get("data", {}).get("list", [])
+    total = int(data.get("total", 0) or data.get("data", {}).get("total", 0))
+    for item in items:
+        item["_optionType"] = opt_type
+        item["_investCoin"] = invest
+        item["_exercisedCoin"] = exercised
+    return items, total
+
+
+def _fetch_dual_products(coin: str) -> list:
+    """Fetch dual investment products for both CALL and PUT.
+
+    Page 1 of each side is fetched concurrently to learn ``total``; all
+    remaining pages are then fetched in one concurrent batch.
+    """
+    legs = []
     for opt_type, invest, exercised in [
         ("CALL", coin, "USDT"),
         ("PUT", "USDT", coin),
     ]:
-        page = 1
-        while True:
-            params = _sign({
-                "optionType": opt_type,
-                "exercisedCoin": exercised,
-                "investCoin": invest,
-                "pageSize": 100,
-                "pageIndex": page,
-            })
-            r = requests.get(base_url, params=params, headers=_headers(), timeout=15)
-            r.raise_for_status()
-            data = r.json()
-            items = data.get("list") or data.get("data", {}).get("list", [])
-            if not items:
-                break
-            for item in items:
-                item["_optionType"] = opt_type
-                item["_investCoin"] = invest
-                item["_exercisedCoin"] = exercised
-            products.extend(items)
-            total = int(data.get("total", 0) or data.get("data", {}).get("total", 0))
-            if page * 100 >= total:
-                break
-            page += 1
+        # 每一侧的固定参数只编码一次，逐页只追加 pageIndex/timestamp 后签名
+        base_query = urlencode({
+            "optionType": opt_type,
+            "exercisedCoin": exercised,
+            "investCoin": invest,
+            "pageSize": DUAL_PAGE_SIZE,
+        })
+        legs.append((opt_type, invest, exercised, base_query))
+    first_pages = list(_EXECUTOR.map(lambda leg: _fetch_dual_page(*leg, 1), legs))
+
+    rest = []
+    for i, (items, total) in enumerate(first_pages):
+        if not items:
+            continue
+        pages = math.ceil(total / DUAL_PAGE_SIZE)
+        rest.extend((i, page) for page in range(2, pages + 1))
+    rest_pages = list(_EXECUTOR.map(
+        lambda job: _fetch_dual_page(*legs[job[0]], job[1]), rest
+    ))
 
+    # 保持原有顺序：CALL 各页在前，PUT 各页在后
+    products = []
+    for i, (items, _) in enumerate(first_pages):
+        products.extend(items)
+        for (leg_idx, _), (page_items, _) in zip(rest, rest_pages):
+            if leg_idx == i:
+                products.extend(page_items)
     return products
 
 
-def fetch_option_tickers(coin: str) -> dict:
-    """Fetch all option tickers and return dict keyed by symbol."""
+_ticker_etags = {}  # coin -> (ETag, 过滤后的行情快照)
+
+
+def _fetch_option_snapshot(coin: str) -> tuple:
+    """Fetch option tickers for coin, return (tickers by symbol, {symbol: (bid, qty)}).
+
+    The (bid, qty) float index is built from the same response, so both
+    halves of the snapshot always expire together. Sends If-None-Match
+    when the last response carried an ETag and reuses the snapshot on 304.
+    """
     url = f"{BINANCE_EAPI_BASE}/eapi/v1/ticker"
-    r = requests.get(url, timeout=15)
+    prev = _ticker_etags.get(coin)
+    headers = {"If-None-Match": prev[0]} if prev else None
+    r = _get(url, headers=headers, timeout=15)
+    if r.status_code == 304 and prev:
+        return prev[1]
     r.raise_for_status()
     prefix = f"{coin}-"
-    result = {}
-    for t in r.json():
-        sym = t.get("symbol", "")
-        if sym.startswith(prefix):
-            result[sym] = t
-    return result
+    data = orjson.loads(r.content)
+    tickers = {t["symbol"]: t for t in data if t.get("symbol", "").startswith(prefix)}
+    # 全量行情里大部分是其他币种，过滤后立即释放，避免缓存期间一直占着内存
+    del data
+    bids = {
+        sym: (float(t.get("bidPrice", 0) or 0), float(t.get("bidQty", 0) or 0))
+        for sym, t in tickers.items()
+    }
+    snapshot = (tickers, bids)
+    etag = r.headers.get("ETag")
+    if etag:
+        _ticker_etags[coin] = (etag, snapshot)
+    return snapshot
+
+
+def _fetch_option_tickers(coin: str) -> dict:
+    """Fetch all option tickers and return dict keyed by symbol."""
+    return _fetch_option_snapshot(coin)[0]
+
+
+# 行情约 1s 精度即可，产品列表变化更慢；缓存结果为只读共享对象
+fetch_spot_price = _ttl_cache(1.0)(_fetch_spot_price)
+fetch_option_snapshot = _ttl_cache(2.0)(_fetch_option_snapshot)
+fetch_dual_products = _ttl_cache(30.0)(_fetch_dual_products)
+
+
+def fetch_option_tickers(coin: str) -> dict:
+    """Cached option tickers keyed by symbol."""
+    return fetch_option_snapshot(coin)[0]
 
 
-def fetch_option_depth(symbol: str) -> tuple:
-    """Fetch order book and return (best bid price, best bid qty)."""
+def fetch_option_bids(coin: str) -> dict:
+    """Cached {symbol: (bid price, bid qty)} index of the same ticker snapshot."""
+    return fetch_option_snapshot(coin)[1]
+
+
+def _fetch_option_depth(symbol: str) -> tuple:
+    """Fetch order book and return (best bid price, best bid qty).
+
+    One request per contract — prefer the bulk ticker snapshot and only
+    fall back to this for contracts whose ticker shows no bid.
+    """
     url = f"{BINANCE_EAPI_BASE}/eapi/v1/depth?symbol={symbol}&limit=5"
-    r = requests.get(url, timeout=10)
+    r = _get(url, timeout=10)
     r.raise_for_status()
-    bids = r.json().get("bids", [])
+    bids = orjson.loads(r.content).get("bids", [])
     if bids:
         return float(bids[0][0]), float(bids[0][1])
     return 0.0, 0.0
 
 
+# 合约数量随到期不断变化，限制缓存条目数，避免已到期合约一直驻留内存
+fetch_option_depth = _ttl_cache(2.0, maxsize=512)(_fetch_option_depth)
+
+
+def fetch_option_depths(symbols) -> dict:
+    """Best bid for many symbols, return {symbol: (bid, qty)}.
+
+    Top of book is read from the bulk ticker snapshot (one request per
+    coin); /depth is queried concurrently only for symbols without a bid.
+    """
+    symbols = list(symbols)
+    bids_by_coin = {}
+    result = {}
+    missing = []
+    for sym in symbols:
+        coin = sym.split("-", 1)[0]
+        if coin not in bids_by_coin:
+            bids_by_coin[coin] = fetch_option_bids(coin)
+        bid, bid_qty = bids_by_coin[coin].get(sym, (0.0, 0.0))
+        if bid > 0 and bid_qty > 0:
+            result[sym] = (bid, bid_qty)
+        else:
+            missing.append(sym)
+    result.update(zip(missing, _DEPTH_POOL.map(fetch_option_depth, missing)))
+    return {sym: result[sym] for sym in symbols}
+
+
 # ── Deribit API calls ─────────────────────────────────────────────────────────
 
 DERIBIT_MONTH_MAP = {
@@ -156,18 +355,18 @@ DERIBIT_MONTH_MAP = {
 def fetch_deribit_index(coin: str) -> float:
     """Fetch Deribit USD index price for coin."""
     url = f"{DERIBIT_API_BASE}/public/get_index_price?index_name={coin.lower()}_usd"
-    r = requests.get(url, timeout=10)
+    r = _get(url, timeout=10)
     r.raise_for_status()
-    return float(r.json()["result"]["index_price"])
+    return float(orjson.loads(r.content)["result"]["index_price"])
 
 
 def fetch_deribit_tickers(coin: str) -> dict:
     """Fetch Deribit option book summaries, return {instrument_name: data}."""
     url = f"{DERIBIT_API_BASE}/public/get_book_summary_by_currency?currency={coin}&kind=option"
-    r = requests.get(url, timeout=15)
+    r = _get(url, timeout=15)
     r.raise_for_status()
     result = {}
-    for item in r.json().get("result", []):
+    for item in orjson.loads(r.content).get("result", []):
         result[item["instrument_name"]] = item
     return result
 
@@ -217,9 +416,11 @@ def _parse_deribit_instrument(name: str):
 
 def compare_deribit(coin: str) -> dict:
     """Fetch Deribit CALL option data for coin."""
-    spot = fetch_spot_price(coin)
-    deribit_index = fetch_deribit_index(coin)
+    spot_fut = _EXECUTOR.submit(fetch_spot_price, coin)
+    index_fut = _EXECUTOR.submit(fetch_deribit_index, coin)
     deribit_tickers = fetch_deribit_tickers(coin)
+    spot = spot_fut.result()
+    deribit_index = index_fut.result()
 
     results = []
 
@@ -299,35 +500,98 @@ def compare_deribit(coin: str) -> dict:
 
 # ── core comparison logic ────────────────────────────────────────────────────
 
+# 期权交易手续费 0.024%（按名义价值计算；行权费 0.015% 仅实值到期时收取，未计入）
+OPTION_FEE_RATE = 0.00024
+
+# 各输出字段保留的小数位（按列取整）
+_METRIC_DECIMALS = {
+    "option_apr_gross": 6,
+    "option_apr_net": 6,
+    "fee_apr": 6,
+    "diff_apr": 6,
+    "spread_pct": 2,
+    "dual_profit": 2,
+    "option_profit": 2,
+    "extra_profit": 2,
+    "bid_notional": 2,
+}
+
+
+def _option_metrics(spot: float, strike, days, bid, bid_qty, dual_apr, is_put,
+                    invest_amount: float) -> dict:
+    """Vectorized APR / profit math over matched products (NumPy arrays)."""
+    # 复用缓冲区原地计算，减少中间数组分配
+    annualize = np.divide(365.0, days)
+    denom = np.where(is_put, strike, spot)
+    net_bid = np.subtract(bid, spot * OPTION_FEE_RATE)
+
+    option_apr_gross = np.divide(bid, denom)
+    option_apr_gross *= annualize
+    option_apr_net = np.divide(net_bid, denom, out=net_bid)
+    option_apr_net *= annualize
+    fee_apr = option_apr_gross - option_apr_net
+    diff_apr = option_apr_net - dual_apr
+    spread_pct = np.divide(
+        diff_apr, option_apr_net,
+        out=np.zeros_like(diff_apr), where=option_apr_net > 0,
+    )
+    spread_pct *= 100
+
+    # 10万U 实际利润计算
+    period = days / 365
+    dual_profit = invest_amount * dual_apr * period
+    option_profit = invest_amount * option_apr_net * period
+
+    return {
+        "option_apr_gross": option_apr_gross,
+        "option_apr_net": option_apr_net,
+        "fee_apr": fee_apr,
+        "diff_apr": diff_apr,
+        "spread_pct": spread_pct,
+        "dual_profit": dual_profit,
+        "option_profit": option_profit,
+        "extra_profit": option_profit - dual_profit,
+        # Bid 流动性（以 USDT 计）
+        "bid_notional": bid_qty * spot,
+    }
+
+
 def compare(coin: str) -> dict:
     invest_amount = 100000  # 固定投入金额 10万 USDT
-    spot = fetch_spot_price(coin)
+    # 现货价与期权行情交给线程池，双币产品（内部自行并发分页）在当前线程拉取
+    spot_fut = _EXECUTOR.submit(fetch_spot_price, coin)
+    bids_fut = _EXECUTOR.submit(fetch_option_bids, coin)
     products = fetch_dual_products(coin)
-    tickers = fetch_option_tickers(coin)
-
-    results = []
+    spot = spot_fut.result()
+    bids = bids_fut.result()
+
+    # 先按列一次性构造合约代码并批量查行情，循环体只做取值与分流
+    types = [p["_optionType"] for p in products]
+    strikes = [float(p["strikePrice"]) for p in products]
+    settles = [int(p["settleDate"]) for p in products]
+    fields = [_expiry_fields(ts) for ts in settles]
+    symbols = [
+        f"{coin}-{yymmdd}-{_format_strike(p['strikePrice'])}-{'C' if t == 'CALL' else 'P'}"
+        for p, t, (yymmdd, _) in zip(products, types, fields)
+    ]
+    bid_list = [bids.get(sym) for sym in symbols]
+
+    # 剩余天数与标签只取决于到期时间，同一到期日只算一次
+    now_ms = _now_ms()
+    day_info = {}
+    for ts in set(settles):
+        days = _days_until(ts, now_ms)
+        day_info[ts] = (days, _days_label(days))
+
+    matched = []
     unmatched = []
 
-    for p in products:
-        opt_type = p["_optionType"]
-        strike = float(p["strikePrice"])
-        settle_ts = int(p["settleDate"])
+    for p, opt_type, strike, settle_ts, (_, expiry), option_symbol, bid_pair in zip(
+        products, types, strikes, settles, fields, symbols, bid_list
+    ):
         dual_apr = float(p["apr"])
-
-        strike_str = _format_strike(strike)
-        yymmdd = _expiry_yymmdd(settle_ts)
-        cp = "C" if opt_type == "CALL" else "P"
-        option_symbol = f"{coin}-{yymmdd}-{strike_str}-{cp}"
-
-        days = _days_until(settle_ts)
-        expiry = _expiry_date(settle_ts)
-
-        ticker = tickers.get(option_symbol)
-        bid = 0.0
-        bid_qty = 0.0
-        if ticker:
-            bid = float(ticker.get("bidPrice", 0) or 0)
-            bid_qty = float(ticker.get("bidQty", 0) or 0)
+        days, days_label = day_info[settle_ts]
+        bid, bid_qty = bid_pair or (0.0, 0.0)
 
         if bid <= 0:
             unmatched.append({
@@ -338,72 +602,72 @@ def compare(coin: str) -> dict:
                 "strike": strike,
                 "expiry": expiry,
                 "days": days,
-                "daysLabel": _days_label(days),
+                "daysLabel": days_label,
                 "dualAPR": dual_apr,
                 "optionSymbol": option_symbol,
-                "reason": "no bid" if ticker else "no contract",
+                "reason": "no bid" if bid_pair else "no contract",
             })
             continue
 
-        # 期权交易手续费 0.024%（按名义价值计算；行权费 0.015% 仅实值到期时收取，未计入）
-        fee = spot * 0.00024
-        net_bid = bid - fee
-
-        if opt_type == "PUT":
-            option_apr_gross = (bid / strike) * (365 / days)
-            option_apr_net = (net_bid / strike) * (365 / days)
-        else:
-            option_apr_gross = (bid / spot) * (365 / days)
-            option_apr_net = (net_bid / spot) * (365 / days)
-
-        fee_apr = option_apr_gross - option_apr_net
-        diff_apr = option_apr_net - dual_apr
-        spread_pct = (diff_apr / option_apr_net * 100) if option_apr_net > 0 else 0
-
-        # 10万U 实际利润计算
-        period = days / 365
-        dual_profit = invest_amount * dual_apr * period
-        option_profit = invest_amount * option_apr_net * period
-        extra_profit = option_profit - dual_profit
-
-        # Bid 流动性（以 USDT 计）
-        bid_notional = bid_qty * spot
-
-        results.append({
-            "coin": coin,
-            "type": opt_type,
-            "typeLabel": f"{opt_type} ({'高卖' if opt_type == 'CALL' else '低买'})",
-            "investCoin": p["_investCoin"],
-            "strike": strike,
-            "expiry": expiry,
-            "days": days,
-            "daysLabel": _days_label(days),
-            "spotPrice": spot,
-            "dualAPR": round(dual_apr, 6),
-            "optionBid": round(bid, 4),
-            "bidQty": round(bid_qty, 4),
-            "bidNotional": round(bid_notional, 2),
-            "optionAPR": round(option_apr_gross, 6),
-            "optionAPRNet": round(option_apr_net, 6),
-            "feeAPR": round(fee_apr, 6),
-            "diffAPR": round(diff_apr, 6),
-            "spreadPct": round(spread_pct, 2),
-            "dualProfit": round(dual_profit, 2),
-            "optionProfit": round(option_profit, 2),
-            "extraProfit": round(extra_profit, 2),
-            "optionSymbol": option_symbol,
-        })
+        matched.append((p, opt_type, strike, expiry, days, days_label, dual_apr,
+                        bid, bid_qty, option_symbol))
 
-    spreads = [r["spreadPct"] for r in results]
-    diffs = [r["diffAPR"] for r in results]
+    results = []
+    spreads = diffs = np.empty(0)
+    if matched:
+        cols = list(zip(*matched))
+        metrics = _option_metrics(
+            spot,
+            strike=np.array(cols[2], dtype=float),
+            days=np.array(cols[4], dtype=float),
+            bid=np.array(cols[7], dtype=float),
+            bid_qty=np.array(cols[8], dtype=float),
+            dual_apr=np.array(cols[6], dtype=float),
+            is_put=np.array([t == "PUT" for t in cols[1]]),
+            invest_amount=invest_amount,
+        )
+        spreads = metrics["spread_pct"]
+        diffs = metrics["diff_apr"]
+        # 用内置 round 逐列取整：np.round 先缩放再取整，临界值附近会与 round 差一位
+        m = {
+            k: [round(x, _METRIC_DECIMALS[k]) for x in v.tolist()]
+            for k, v in metrics.items()
+        }
+
+        for i, (p, opt_type, strike, expiry, days, days_label, dual_apr,
+                bid, bid_qty, option_symbol) in enumerate(matched):
+            results.append({
+                "coin": coin,
+                "type": opt_type,
+                "typeLabel": f"{opt_type} ({'高卖' if opt_type == 'CALL' else '低买'})",
+                "investCoin": p["_investCoin"],
+                "strike": strike,
+                "expiry": expiry,
+                "days": days,
+                "daysLabel": days_label,
+                "spotPrice": spot,
+                "dualAPR": round(dual_apr, 6),
+                "optionBid": round(bid, 4),
+                "bidQty": round(bid_qty, 4),
+                "bidNotional": m["bid_notional"][i],
+                "optionAPR": m["option_apr_gross"][i],
+                "optionAPRNet": m["option_apr_net"][i],
+                "feeAPR": m["fee_apr"][i],
+                "diffAPR": m["diff_apr"][i],
+                "spreadPct": m["spread_pct"][i],
+                "dualProfit": m["dual_profit"][i],
+                "optionProfit": m["option_profit"][i],
+                "extraProfit": m["extra_profit"][i],
+                "optionSymbol": option_symbol,
+            })
 
     stats = {
         "count": len(results),
         "unmatched": len(unmatched),
-        "avgSpread": round(sum(spreads) / len(spreads), 2) if spreads else 0,
-        "maxSpread": round(max(spreads), 2) if spreads else 0,
-        "minSpread": round(min(spreads), 2) if spreads else 0,
-        "avgDiffAPR": round(sum(diffs) / len(diffs), 6) if diffs else 0,
+        "avgSpread": round(float(spreads.mean()), 2) if spreads.size else 0,
+        "maxSpread": round(float(spreads.max()), 2) if spreads.size else 0,
+        "minSpread": round(float(spreads.min()), 2) if spreads.size else 0,
+        "avgDiffAPR": round(float(diffs.mean()), 6) if diffs.size else 0,
     }
 
     return {
@@ -418,6 +682,15 @@ def compare(coin: str) -> dict:
 
 # ── routes ───────────────────────────────────────────────────────────────────
 
+def _json(obj, status: int = 200):
+    """JSON response serialized with orjson (faster than jsonify on large payloads)."""
+    return app.response_class(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype="application/json",
+    )
+
+
 @app.route("/")
 def index():
     return send_from_directory("static", "index.html")
@@ -430,7 +703,7 @@ def options_page():
 
 @app.route("/api/health")
 def health():
-    return jsonify({
+    return _json({
         "ok": True,
         "apiKeyConfigured": bool(BINANCE_API_KEY and BINANCE_API_SECRET),
     })
@@ -440,56 +713,56 @@ def health():
 def api_spot_price():
     coin = request.args.get("coin", "ETH").upper()
     if coin not in SUPPORTED_COINS:
-        return jsonify({"ok": False, "error": f"Unsupported coin: {coin}"}), 400
+        return _json({"ok": False, "error": f"Unsupported coin: {coin}"}, 400)
     try:
         price = fetch_spot_price(coin)
-        return jsonify({"ok": True, "coin": coin, "price": price})
+        return _json({"ok": True, "coin": coin, "price": price})
     except Exception as e:
         tb = traceback.format_exc()
         print(f"[ERROR] /api/spot-price?coin={coin}\n{tb}")
-        return jsonify({"ok": False, "error": str(e), "trace": tb}), 500
+        return _json({"ok": False, "error": str(e), "trace": tb}, 500)
 
 
 @app.route("/api/dual-products")
 def api_dual_products():
     coin = request.args.get("coin", "ETH").upper()
     if coin not in SUPPORTED_COINS:
-        return jsonify({"ok": False, "error": f"Unsupported coin: {coin}"}), 400
+        return _json({"ok": False, "error": f"Unsupported coin: {coin}"}, 400)
     try:
         products = fetch_dual_products(coin)
-        return jsonify({"ok": True, "coin": coin, "count": len(products), "products": products})
+        return _json({"ok": True, "coin": coin, "count": len(products), "products": products})
     except Exception as e:
         tb = traceback.format_exc()
         print(f"[ERROR] /api/dual-products?coin={coin}\n{tb}")
-        return jsonify({"ok": False, "error": str(e), "trace": tb}), 500
+        return _json({"ok": False, "error": str(e), "trace": tb}, 500)
 
 
 @app.route("/api/options-tickers")
 def api_options_tickers():
     coin = request.args.get("coin", "ETH").upper()
     if coin not in SUPPORTED_COINS:
-        return jsonify({"ok": False, "error": f"Unsupported coin: {coin}"}), 400
+        return _json({"ok": False, "error": f"Unsupported coin: {coin}"}, 400)
     try:
         tickers = fetch_option_tickers(coin)
-        return jsonify({"ok": True, "coin": coin, "count": len(tickers), "tickers": tickers})
+        return _json({"ok": True, "coin": coin, "count": len(tickers), "tickers": tickers})
     except Exception as e:
         tb = traceback.format_exc()
         print(f"[ERROR] /api/options-tickers?coin={coin}\n{tb}")
-        return jsonify({"ok": False, "error": str(e), "trace": tb}), 500
+        return _json({"ok": False, "error": str(e), "trace": tb}, 500)
 
 
 @app.route("/api/compare")
 def api_compare():
     coin = request.args.get("coin", "ETH").upper()
     if coin not in SUPPORTED_COINS:
-        return jsonify({"ok": False, "error": f"Unsupported coin: {coin}"}), 400
+        return _json({"ok": False, "error": f"Unsupported coin: {coin}"}, 400)
     try:
         data = compare(coin)
-        return jsonify({"ok": True, "data": data})
+        return _json({"ok": True, "data": data})
     except Exception as e:
         tb = traceback.format_exc()
         print(f"[ERROR] /api/compare?coin={coin}\n{tb}")
-        return jsonify({"ok": False, "error": str(e), "trace": tb}), 500
+        return _json({"ok": False, "error": str(e), "trace": tb}, 500)
 
 
 @app.route("/deribit")
@@ -501,14 +774,14 @@ def deribit_page():
 def api_deribit_compare():
     coin = request.args.get("coin", "ETH").upper()
     if coin not in SUPPORTED_COINS:
-        return jsonify({"ok": False, "error": f"Unsupported coin: {coin}"}), 400
+        return _json({"ok": False, "error": f"Unsupported coin: {coin}"}, 400)
     try:
         data = compare_deribit(coin)
-        return jsonify({"ok": True, "data": data})
+        return _json({"ok": True, "data": data})
     except Exception as e:
         tb = traceback.format_exc()
         print(f"[ERROR] /api/deribit-compare?coin={coin}\n{tb}")
-        return jsonify({"ok": False, "error": str(e), "trace": tb}), 500
+        return _json({"ok": False, "error": str(e), "trace": tb}, 500)
 
 
 if __name__ == "__main__":